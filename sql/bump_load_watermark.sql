@@ -0,0 +1,18 @@
+-- bump_load_watermark.sql  (included via \ir at the end of every loader that rewrites core/steam tables)
+-- Records "table X was reloaded at T" so readers (tools/dashboard_queries.py) can drop cached results.
+-- Set the reloaded tables first, comma-separated:
+--   \set watermark_tables core.fact_app_performance_daily,core.dim_app_info
+
+CREATE SCHEMA IF NOT EXISTS raw;
+
+CREATE TABLE IF NOT EXISTS raw.load_watermark (
+  table_name TEXT        NOT NULL,
+  updated_at timestamptz NOT NULL DEFAULT now(),
+  CONSTRAINT pk_load_watermark PRIMARY KEY (table_name)
+);
+
+INSERT INTO raw.load_watermark(table_name, updated_at)
+SELECT t, clock_timestamp()
+FROM unnest(string_to_array(:'watermark_tables', ',')) AS t
+ON CONFLICT (table_name) DO UPDATE SET
+  updated_at = EXCLUDED.updated_at;
@@ -2,22 +2,35 @@
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 \echo Loading from :app_csv
 
+-- Hot/cold split mode: sets :dim_app_info_split
+\ir split_dim_app_info_detect.sql
+
 BEGIN;
 
 CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS core;
 
--- Ensure target columns exist (safe to run repeatedly)
+-- Ensure target columns exist (safe to run repeatedly; the split tables already have them)
+\if :dim_app_info_split
+\else
 ALTER TABLE core.dim_app_info
   ADD COLUMN IF NOT EXISTS rating_count INTEGER,
   ADD COLUMN IF NOT EXISTS rating_count_for_current_version INTEGER,
   ADD COLUMN IF NOT EXISTS rating_for_current_version DOUBLE PRECISION;
+\endif
+
+COMMIT;
+
+-- Raw table is created in the same transaction as its COPY, so COPY ... FREEZE applies
+BEGIN;
 
 DROP TABLE IF EXISTS raw.dim_app_info_raw;
 
-CREATE TABLE raw.dim_app_info_raw (
+CREATE :staging_kind TABLE raw.dim_app_info_raw (
   app_id TEXT,
   canonical_country TEXT,
   name TEXT,
@@ -70,20 +83,80 @@ CREATE TABLE raw.dim_app_info_raw (
   supported_languages TEXT,
   country_release_date TEXT,
   cleaned_publisher_name TEXT,
-  revenue_multiplier TEXT
+  revenue_multiplier TEXT,
+
+  -- Source position (COPY assigns it in file order); the last line per app_id wins
+  line_no BIGINT GENERATED ALWAYS AS IDENTITY
+);
+
+COPY raw.dim_app_info_raw (
+  app_id,
+  canonical_country,
+  name,
+  publisher_name,
+  publisher_id,
+  humanized_name,
+  icon_url,
+  os,
+  active,
+  url,
+  categories,
+  valid_countries,
+  top_countries,
+  app_view_url,
+  publisher_profile_url,
+  release_date,
+  updated_date,
+  in_app_purchases,
+  rating,
+  price,
+  global_rating_count,
+  rating_count,
+  rating_count_for_current_version,
+  rating_for_current_version,
+  version,
+  apple_watch_enabled,
+  imessage_enabled,
+  imessage_icon,
+  humanized_worldwide_last_month_downloads,
+  humanized_worldwide_last_month_revenue,
+  bundle_id,
+  support_url,
+  website_url,
+  privacy_policy_url,
+  eula_url,
+  publisher_email,
+  publisher_address,
+  publisher_country,
+  feature_graphic,
+  short_description,
+  advisories,
+  content_rating,
+  unified_app_id,
+  screenshot_urls,
+  tablet_screenshot_urls,
+  description,
+  subtitle,
+  promo_text,
+  permissions,
+  supported_languages,
+  country_release_date,
+  cleaned_publisher_name,
+  revenue_multiplier
+)
+FROM :'app_csv'
+WITH (
+  FORMAT csv, HEADER true, QUOTE '"', ESCAPE '"',
+  FREEZE              -- table created in this transaction: rows land pre-frozen
 );
 
 COMMIT;
 
-CREATE TABLE IF NOT EXISTS raw.dim_app_info_rejects AS
+-- Recreated every run so its shape always follows raw.dim_app_info_raw (line_no included)
+DROP TABLE IF EXISTS raw.dim_app_info_rejects;
+CREATE :staging_kind TABLE raw.dim_app_info_rejects AS
 SELECT * FROM raw.dim_app_info_raw WHERE false;
 
-COPY raw.dim_app_info_raw
-FROM :'app_csv'
-WITH (FORMAT csv, HEADER true, QUOTE '"', ESCAPE '"');
-
-TRUNCATE TABLE raw.dim_app_info_rejects;
-
 INSERT INTO raw.dim_app_info_rejects
 SELECT *
 FROM raw.dim_app_info_raw
@@ -95,7 +168,11 @@ WHERE app_id IS NULL
 BEGIN;
 
 -- Full refresh behavior (optional but recommended)
+\if :dim_app_info_split
+TRUNCATE TABLE core.fact_app_performance_daily, core.dim_app_info_detail, core.dim_app_info_hot;
+\else
 TRUNCATE TABLE core.fact_app_performance_daily, core.dim_app_info;
+\endif
 
 SELECT
   COUNT(*) AS total_raw,
@@ -103,7 +180,9 @@ SELECT
   COUNT(*) FILTER (WHERE app_id IS NOT NULL AND (length(app_id) > 32 OR app_id !~ '^[0-9]+$')) AS bad_app_id
 FROM raw.dim_app_info_raw;
 
-INSERT INTO core.dim_app_info (
+\ir split_dim_app_info_stage.sql
+
+INSERT INTO :dim_app_info_target (
   app_id,
   canonical_country,
   name,
@@ -212,15 +291,21 @@ SELECT
   core.to_timestamptz_loose(r.country_release_date),
   r.cleaned_publisher_name,
   core.to_int_loose(r.revenue_multiplier)
-FROM (
-  SELECT DISTINCT ON (app_id) *
+FROM raw.dim_app_info_raw r
+JOIN (
+  -- Dedup sorts (app_id, line_no) pairs only, not whole rows; the last line per app_id wins
+  SELECT DISTINCT ON (app_id) line_no
   FROM raw.dim_app_info_raw
   WHERE app_id IS NOT NULL
     AND btrim(app_id) <> ''
     AND length(app_id) <= 32
     AND app_id ~ '^[0-9]+$'
-  ORDER BY app_id
-) r;
+  ORDER BY app_id, line_no DESC
+) w ON w.line_no = r.line_no;
+
+\if :dim_app_info_split
+\ir split_dim_app_info_promote.sql
+\endif
 
 COMMIT;
 
@@ -229,3 +314,14 @@ SELECT app_id, name, unified_app_id
 FROM core.dim_app_info
 ORDER BY app_id
 LIMIT 5;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables core.fact_app_performance_daily,core.dim_app_info
+\ir bump_load_watermark.sql
+
+-- WAL-free mode: staging rows are disposable once promoted
+\if :wal_free_staging
+TRUNCATE TABLE raw.dim_app_info_raw;
+\endif
+
+\ir wal_report.sql
@@ -1,7 +1,15 @@
 -- load_dim_app_info_ndjson.sql  (DROP-IN: also captures rows whose unified_app_id is missing in dim_game_info)
+-- Tip: for very large / duplicate-heavy files, pre-dedup before loading:
+--   python tools/dedup_ndjson.py app.ndjson --key app_id --keep last
+-- Caveat: the tool keeps the last line per app_id, this loader keeps the last line whose
+-- unified_app_id exists in dim_game_info. If that last line is an FK miss, the pre-deduped
+-- file loses the app (it only shows up in raw.dim_app_info_missing_game) while the raw
+-- file would still load an earlier line. Skip the tip when FK misses are expected.
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 \echo Loading APP NDJSON from :app_ndjson
 
 -- 0) Ensure schemas exist
@@ -10,20 +18,30 @@ CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS core;
 COMMIT;
 
+-- Hot/cold split mode: sets :dim_app_info_split
+\ir split_dim_app_info_detect.sql
+
 -- 1) Full refresh (FK-safe order)
 BEGIN;
+\if :dim_app_info_split
+TRUNCATE TABLE
+  core.fact_app_performance_daily,
+  core.dim_app_info_detail,
+  core.dim_app_info_hot;
+\else
 TRUNCATE TABLE
   core.fact_app_performance_daily,
   core.dim_app_info;
+\endif
 COMMIT;
 
 -- 2) Staging: 1 physical line = 1 JSON text
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_app_info_lines;
-CREATE TABLE raw.dim_app_info_lines (
-  line TEXT
+CREATE :staging_kind TABLE raw.dim_app_info_lines (
+  line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+  line    TEXT
 );
-COMMIT;
 
 -- Load NDJSON safely (avoid FORMAT text, which unescapes \n)
 COPY raw.dim_app_info_lines(line)
@@ -32,13 +50,15 @@ WITH (
   FORMAT csv,
   DELIMITER E'\x1F',  -- Unit Separator (very unlikely to appear)
   QUOTE     E'\x02',  -- STX (unlikely)
-  ESCAPE    E'\x03'   -- ETX (unlikely)
+  ESCAPE    E'\x03',   -- ETX (unlikely)
+  FREEZE              -- table created in this transaction: rows land pre-frozen
 );
+COMMIT;
 
 -- 3) Rejects table for debugging bad app_id / invalid json
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_app_info_rejects;
-CREATE TABLE raw.dim_app_info_rejects (
+CREATE :staging_kind TABLE raw.dim_app_info_rejects (
   line   TEXT,
   reason TEXT
 );
@@ -68,7 +88,7 @@ WHERE l.line IS NULL
 -- 3b) Table to store apps whose unified_app_id is NOT present in dim_game_info
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_app_info_missing_game;
-CREATE TABLE raw.dim_app_info_missing_game (
+CREATE :staging_kind TABLE raw.dim_app_info_missing_game (
   line           TEXT,
   app_id         TEXT,
   unified_app_id TEXT,
@@ -79,8 +99,10 @@ COMMIT;
 -- 4) Parse + cast + split (missing FK vs good) + dedup + insert
 BEGIN;
 
+\ir split_dim_app_info_stage.sql
+
 WITH parsed AS (
-  SELECT line::jsonb AS j, line
+  SELECT line::jsonb AS j, line, line_no
   FROM raw.dim_app_info_lines
   WHERE line IS NOT NULL
     AND btrim(line) <> ''
@@ -89,6 +111,7 @@ WITH parsed AS (
 extracted AS (
   SELECT
     line,
+    line_no,
     j->>'app_id'                                      AS app_id,
     j->>'canonical_country'                            AS canonical_country,
     j->>'name'                                         AS name,
@@ -188,10 +211,16 @@ present_game AS (
       WHERE d.unified_app_id = g.unified_app_id
     )
 ),
-dedup AS (
-  SELECT DISTINCT ON (app_id) *
+-- Dedup sorts (app_id, line_no) pairs only, never whole rows; last line in the file wins
+winner AS (
+  SELECT DISTINCT ON (app_id) line_no
   FROM present_game
-  ORDER BY app_id
+  ORDER BY app_id, line_no DESC
+),
+dedup AS (
+  SELECT p.*
+  FROM present_game p
+  JOIN winner w ON w.line_no = p.line_no
 ),
 ins_missing AS (
   INSERT INTO raw.dim_app_info_missing_game(line, app_id, unified_app_id, reason)
@@ -199,7 +228,7 @@ ins_missing AS (
   FROM missing_game
   RETURNING 1
 )
-INSERT INTO core.dim_app_info (
+INSERT INTO :dim_app_info_target (
   app_id,
   canonical_country,
   name,
@@ -310,4 +339,19 @@ SELECT
   revenue_multiplier
 FROM dedup;
 
+\if :dim_app_info_split
+\ir split_dim_app_info_promote.sql
+\endif
+
 COMMIT;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables core.fact_app_performance_daily,core.dim_app_info
+\ir bump_load_watermark.sql
+
+-- WAL-free mode: staging lines are disposable once promoted
+\if :wal_free_staging
+TRUNCATE TABLE raw.dim_app_info_lines;
+\endif
+
+\ir wal_report.sql
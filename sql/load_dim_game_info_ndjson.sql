@@ -2,6 +2,8 @@
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 \echo Loading GAME NDJSON from :'game_ndjson'
 
 -- 0) Ensure schemas exist
@@ -10,21 +12,32 @@ CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS core;
 COMMIT;
 
+-- Hot/cold split mode: sets :dim_app_info_split
+\ir split_dim_app_info_detect.sql
+
 -- 1) Full refresh order (FK-safe)
 BEGIN;
+\if :dim_app_info_split
+TRUNCATE TABLE
+  core.fact_app_performance_daily,
+  core.dim_app_info_detail,
+  core.dim_app_info_hot,
+  core.dim_game_info;
+\else
 TRUNCATE TABLE
   core.fact_app_performance_daily,
   core.dim_app_info,
   core.dim_game_info;
+\endif
 COMMIT;
 
 -- 2) Staging table: 1 physical line = 1 JSON text
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_game_info_lines;
-CREATE TABLE raw.dim_game_info_lines (
-  line TEXT
+CREATE :staging_kind TABLE raw.dim_game_info_lines (
+  line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+  line    TEXT
 );
-COMMIT;
 
 -- 3) Load NDJSON lines
 -- IMPORTANT: DO NOT use FORMAT text (it will unescape \n into real newlines and break JSON)
@@ -35,13 +48,15 @@ WITH (
   FORMAT csv,
   DELIMITER E'\x1F',   -- Unit Separator
   QUOTE     E'\x02',   -- STX
-  ESCAPE    E'\x03'    -- ETX
+  ESCAPE    E'\x03',   -- ETX
+  FREEZE              -- table created in this transaction: rows land pre-frozen
 );
+COMMIT;
 
 -- 4) Rejects table (so we don't silently drop rows)
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_game_info_rejects;
-CREATE TABLE raw.dim_game_info_rejects (
+CREATE :staging_kind TABLE raw.dim_game_info_rejects (
   line   TEXT,
   reason TEXT
 );
@@ -66,7 +81,7 @@ WHERE l.line IS NULL
 BEGIN;
 
 WITH parsed AS (
-  SELECT line::jsonb AS j
+  SELECT line::jsonb AS j, line_no
   FROM raw.dim_game_info_lines
   WHERE line IS NOT NULL
     AND btrim(line) <> ''
@@ -74,6 +89,7 @@ WITH parsed AS (
 ),
 extracted AS (
   SELECT
+    line_no,
     j->>'unified_app_id'        AS unified_app_id,
     j->>'canonical_app_id'      AS canonical_app_id,
     j->>'name'                  AS name,
@@ -112,12 +128,17 @@ good AS (
   WHERE unified_app_id IS NOT NULL
     AND btrim(unified_app_id) <> ''
 ),
-dedup AS (
-  -- If your source has duplicates per unified_app_id, keep 1 row.
-  -- You can change ORDER BY if you have a better "latest" signal.
-  SELECT DISTINCT ON (unified_app_id) *
+-- If your source has duplicates per unified_app_id, keep 1 row: the last line in the file.
+-- Only (unified_app_id, line_no) pairs are sorted, never whole rows.
+winner AS (
+  SELECT DISTINCT ON (unified_app_id) line_no
   FROM good
-  ORDER BY unified_app_id
+  ORDER BY unified_app_id, line_no DESC
+),
+dedup AS (
+  SELECT g.*
+  FROM good g
+  JOIN winner w ON w.line_no = g.line_no
 )
 INSERT INTO core.dim_game_info (
   unified_app_id,
@@ -219,3 +240,14 @@ SELECT unified_app_id, name
 FROM core.dim_game_info
 ORDER BY unified_app_id
 LIMIT 5;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables core.fact_app_performance_daily,core.dim_app_info,core.dim_game_info
+\ir bump_load_watermark.sql
+
+-- WAL-free mode: staging lines are disposable once promoted
+\if :wal_free_staging
+TRUNCATE TABLE raw.dim_game_info_lines;
+\endif
+
+\ir wal_report.sql
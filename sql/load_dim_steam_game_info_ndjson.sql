@@ -1,7 +1,11 @@
 -- load_dim_steam_game_info_ndjson.sql
+-- Tip: pre-dedup large files (this loader btrims app_id, so strip the key too):
+--   python tools/dedup_ndjson.py steam_game.ndjson --key app_id --keep last --strip-key
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 \echo Loading APP NDJSON from :steam_game_ndjson
 
 -- 0) Ensure schemas exist
@@ -20,10 +24,10 @@ COMMIT;
 -- 2) Staging: 1 physical line = 1 JSON text
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_steam_game_info_lines;
-CREATE TABLE raw.dim_steam_game_info_lines (
-  line TEXT
+CREATE :staging_kind TABLE raw.dim_steam_game_info_lines (
+  line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+  line    TEXT
 );
-COMMIT;
 
 -- Load NDJSON safely (avoid FORMAT text, which unescapes \n)
 COPY raw.dim_steam_game_info_lines(line)
@@ -32,13 +36,15 @@ WITH (
   FORMAT csv,
   DELIMITER E'\x1F',  -- Unit Separator (very unlikely to appear)
   QUOTE     E'\x02',  -- STX (unlikely)
-  ESCAPE    E'\x03'   -- ETX (unlikely)
+  ESCAPE    E'\x03',   -- ETX (unlikely)
+  FREEZE              -- table created in this transaction: rows land pre-frozen
 );
+COMMIT;
 
 -- 3) Rejects table for debugging bad app_id / invalid json
 BEGIN;
 DROP TABLE IF EXISTS raw.dim_steam_game_info_rejects;
-CREATE TABLE raw.dim_steam_game_info_rejects (
+CREATE :staging_kind TABLE raw.dim_steam_game_info_rejects (
   line   TEXT,
   reason TEXT
 );
@@ -69,7 +75,7 @@ WHERE l.line IS NULL
 BEGIN;
 
 WITH parsed AS (
-  SELECT line::jsonb AS j, line
+  SELECT line::jsonb AS j, line, line_no
   FROM raw.dim_steam_game_info_lines
   WHERE line IS NOT NULL
     AND btrim(line) <> ''
@@ -78,6 +84,7 @@ WITH parsed AS (
 extracted AS (
   SELECT
     line,
+    line_no,
     btrim(j->>'app_id')                   AS app_id_txt,
     j->>'name'                            AS name,
     j->>'game_class'                      AS game_class,
@@ -102,6 +109,7 @@ extracted AS (
 good_app_id AS (
   SELECT
     line,
+    line_no,
     app_id_txt::int                       AS app_id,
     name, game_class, game_genre, game_subgenre,
     developer, publisher, language, initial_price,
@@ -112,10 +120,16 @@ good_app_id AS (
     AND length(app_id_txt) <= 255
     AND app_id_txt ~ '^[0-9]+$'
 ),
-dedup AS (
-  SELECT DISTINCT ON (app_id) *
+-- Dedup sorts (app_id, line_no) pairs only, never whole rows; last line in the file wins
+winner AS (
+  SELECT DISTINCT ON (app_id) line_no
   FROM good_app_id
-  ORDER BY app_id
+  ORDER BY app_id, line_no DESC
+),
+dedup AS (
+  SELECT g.*
+  FROM good_app_id g
+  JOIN winner w ON w.line_no = g.line_no
 )
 INSERT INTO steam.dim_steam_game_info (
   app_id, name, game_class, game_genre, game_subgenre,
@@ -129,3 +143,14 @@ SELECT
 FROM dedup;
 
 COMMIT;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables steam.fact_steam_game_performance_monthly,steam.dim_steam_game_info
+\ir bump_load_watermark.sql
+
+-- WAL-free mode: staging lines are disposable once promoted
+\if :wal_free_staging
+TRUNCATE TABLE raw.dim_steam_game_info_lines;
+\endif
+
+\ir wal_report.sql
@@ -2,6 +2,8 @@
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 \echo Loading FACT NDJSON from :fact_ndjson
 
 -- 0) Ensure schemas exist
@@ -14,9 +16,9 @@ COMMIT;
 BEGIN;
 TRUNCATE TABLE core.fact_app_performance_daily;
 
--- 2) Staging: 1 physical line = 1 JSON text
+-- 2) Staging: 1 physical line = 1 JSON text (same transaction as the COPY -> FREEZE allowed)
 DROP TABLE IF EXISTS raw.fact_app_performance_daily_lines;
-CREATE TABLE raw.fact_app_performance_daily_lines (line TEXT);
+CREATE :staging_kind TABLE raw.fact_app_performance_daily_lines (line TEXT);
 
 -- IMPORTANT: do NOT use FORMAT text (it can unescape \n and break JSON)
 COPY raw.fact_app_performance_daily_lines(line)
@@ -25,7 +27,8 @@ WITH (
   FORMAT csv,
   DELIMITER E'\x1F',  -- Unit Separator
   QUOTE     E'\x02',  -- STX
-  ESCAPE    E'\x03'   -- ETX
+  ESCAPE    E'\x03',  -- ETX
+  FREEZE             -- table created in this transaction: rows land pre-frozen
 );
 
 -- 3) Rejects table
@@ -148,10 +151,10 @@ SELECT COUNT(*) AS raw_lines FROM raw.fact_app_performance_daily_lines;
 SELECT COUNT(*) AS fact_rows FROM core.fact_app_performance_daily;
 -- SELECT COUNT(*) AS rejects   FROM raw.fact_app_performance_daily_rejects;
 
-SELECT reason, COUNT(*) AS cnt
+-- SELECT reason, COUNT(*) AS cnt
 -- FROM raw.fact_app_performance_daily_rejects
-GROUP BY reason
-ORDER BY cnt DESC;
+-- GROUP BY reason
+-- ORDER BY cnt DESC;
 
 SELECT MIN(date) AS min_date, MAX(date) AS max_date
 FROM core.fact_app_performance_daily;
@@ -160,3 +163,14 @@ SELECT *
 FROM core.fact_app_performance_daily
 ORDER BY date DESC
 LIMIT 5;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables core.fact_app_performance_daily
+\ir bump_load_watermark.sql
+
+-- WAL-free mode: staging lines are disposable once promoted
+\if :wal_free_staging
+TRUNCATE TABLE raw.fact_app_performance_daily_lines;
+\endif
+
+\ir wal_report.sql
@@ -2,11 +2,13 @@
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS steam;
 
 DROP TABLE IF EXISTS raw.fact_steam_game_perf_monthly_lines;
-CREATE TABLE raw.fact_steam_game_perf_monthly_lines (
+CREATE :staging_kind TABLE raw.fact_steam_game_perf_monthly_lines (
   line_no BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
   line    TEXT
 );
@@ -17,10 +19,19 @@ CREATE TABLE raw.fact_steam_game_perf_monthly_progress (
   updated_at      timestamptz NOT NULL DEFAULT now(),
   total_lines     BIGINT,
   processed_lines BIGINT NOT NULL DEFAULT 0,
-  upserted_rows   BIGINT NOT NULL DEFAULT 0
+  upserted_rows   BIGINT NOT NULL DEFAULT 0,
+  -- WAL / checkpoint baseline taken before the staging COPY (reported by the batched upsert)
+  wal_lsn_start           pg_lsn NOT NULL DEFAULT pg_current_wal_lsn(),
+  checkpoints_timed_start BIGINT,
+  checkpoints_req_start   BIGINT
 );
 
-INSERT INTO raw.fact_steam_game_perf_monthly_progress(total_lines, processed_lines, upserted_rows)
-VALUES (NULL, 0, 0);
+INSERT INTO raw.fact_steam_game_perf_monthly_progress(total_lines, processed_lines, upserted_rows, checkpoints_timed_start, checkpoints_req_start)
+SELECT NULL, 0, 0, checkpoints_timed, checkpoints_req
+FROM pg_stat_bgwriter;
 
+-- COPY with pv; FREEZE needs the TRUNCATE in the same transaction (-1):
+--   pv data.ndjson | psql -v ON_ERROR_STOP=1 -1 \
+--     -c "TRUNCATE raw.fact_steam_game_perf_monthly_lines RESTART IDENTITY" \
+--     -c "COPY raw.fact_steam_game_perf_monthly_lines(line) FROM STDIN WITH (FORMAT csv, DELIMITER E'\x1F', QUOTE E'\x02', ESCAPE E'\x03', FREEZE)"
 \echo "Now run COPY with pv (see command in chat)."
@@ -2,6 +2,8 @@
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 -- 0) Ensure schemas exist
 CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS core;
@@ -10,7 +12,7 @@ CREATE SCHEMA IF NOT EXISTS core;
 TRUNCATE TABLE core.fact_app_performance_daily;
 
 DROP TABLE IF EXISTS raw.fact_app_performance_daily_missing_app;
-CREATE TABLE raw.fact_app_performance_daily_missing_app (
+CREATE :staging_kind TABLE raw.fact_app_performance_daily_missing_app (
   line_no           BIGINT,
   app_id            TEXT,
   country_android   TEXT,
@@ -27,7 +29,7 @@ CREATE TABLE raw.fact_app_performance_daily_missing_app (
 
 -- 2) Staging table with line numbers (identity)
 DROP TABLE IF EXISTS raw.fact_app_performance_daily_lines;
-CREATE TABLE raw.fact_app_performance_daily_lines (
+CREATE :staging_kind TABLE raw.fact_app_performance_daily_lines (
   line_no BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
   line    TEXT
 );
@@ -35,6 +37,12 @@ CREATE TABLE raw.fact_app_performance_daily_lines (
 -- (Optional) reduce noise / avoid autovacuum stealing cycles on staging during the big load
 ALTER TABLE raw.fact_app_performance_daily_lines SET (autovacuum_enabled = false);
 
+-- COPY into staging (WAL-free with wal_free_staging=on). FREEZE needs the table truncated
+-- in the same transaction as the COPY, hence -1 (single transaction) + TRUNCATE:
+--   pv data.ndjson | psql -v ON_ERROR_STOP=1 -1 \
+--     -c "TRUNCATE raw.fact_app_performance_daily_lines RESTART IDENTITY" \
+--     -c "COPY raw.fact_app_performance_daily_lines(line) FROM STDIN WITH (FORMAT csv, DELIMITER E'\x1F', QUOTE E'\x02', ESCAPE E'\x03', FREEZE)"
+
 -- 3) Progress table
 DROP TABLE IF EXISTS raw.fact_app_performance_daily_load_progress;
 CREATE TABLE raw.fact_app_performance_daily_load_progress (
@@ -42,16 +50,42 @@ CREATE TABLE raw.fact_app_performance_daily_load_progress (
   updated_at      timestamptz NOT NULL DEFAULT now(),
   total_lines     BIGINT,
   processed_lines BIGINT NOT NULL DEFAULT 0,
-  inserted_rows   BIGINT NOT NULL DEFAULT 0
+  inserted_rows   BIGINT NOT NULL DEFAULT 0,
+  -- WAL / checkpoint baseline taken before the staging COPY (reported when the load finishes)
+  wal_lsn_start           pg_lsn NOT NULL DEFAULT pg_current_wal_lsn(),
+  checkpoints_timed_start BIGINT,
+  checkpoints_req_start   BIGINT
 );
 
-INSERT INTO raw.fact_app_performance_daily_load_progress(total_lines, processed_lines, inserted_rows)
-VALUES (NULL, 0, 0);
+INSERT INTO raw.fact_app_performance_daily_load_progress(total_lines, processed_lines, inserted_rows, checkpoints_timed_start, checkpoints_req_start)
+SELECT NULL, 0, 0, checkpoints_timed, checkpoints_req
+FROM pg_stat_bgwriter;
+
+-- 3b) Timing log (kept across loads so bulk vs incremental full refreshes can be compared)
+CREATE TABLE IF NOT EXISTS raw.fact_load_timing (
+  run_started_at timestamptz NOT NULL,
+  table_name     TEXT        NOT NULL,
+  mode           TEXT        NOT NULL,  -- 'incremental' | 'bulk'
+  phase          TEXT        NOT NULL,  -- 'drop_secondary' | 'load' | 'rebuild_indexes' | 'validate_fk' | 'total'
+  started_at     timestamptz NOT NULL,
+  finished_at    timestamptz NOT NULL
+);
 
 -- 4) Stored procedure: loads from staging in batches and updates progress
+--    CALL core.load_fact_app_performance_daily_from_staging();                -- incremental (indexes + FK maintained per batch)
+--    CALL core.load_fact_app_performance_daily_from_staging(500000, true);    -- bulk: full reloads only
+--
+--    Bulk mode drops the secondary indexes and fk_fact_app_performance_daily_1, loads,
+--    rebuilds each index with parallel maintenance workers, then re-adds the FK as NOT VALID
+--    and runs VALIDATE CONSTRAINT. Only the PK (needed by ON CONFLICT) is kept during the load.
+--    If a bulk run fails midway, re-run it in bulk mode: that recreates the indexes and the FK.
 DROP PROCEDURE IF EXISTS core.load_fact_app_performance_daily_from_staging(BIGINT);
+DROP PROCEDURE IF EXISTS core.load_fact_app_performance_daily_from_staging(BIGINT, BOOLEAN);
 
-CREATE PROCEDURE core.load_fact_app_performance_daily_from_staging(batch_lines BIGINT DEFAULT 500000)
+CREATE PROCEDURE core.load_fact_app_performance_daily_from_staging(
+  batch_lines BIGINT  DEFAULT 500000,
+  bulk        BOOLEAN DEFAULT false
+)
 LANGUAGE plpgsql
 AS $$
 DECLARE
@@ -59,6 +93,12 @@ DECLARE
   v_from     BIGINT := 1;
   v_to       BIGINT;
   v_ins      BIGINT;
+  v_mode     TEXT := CASE WHEN bulk THEN 'bulk' ELSE 'incremental' END;
+  v_run      timestamptz := clock_timestamp();
+  v_phase    timestamptz;
+  v_wal      TEXT;
+  v_ckpt_t   BIGINT;
+  v_ckpt_r   BIGINT;
 BEGIN
   SELECT max(line_no) INTO v_total FROM raw.fact_app_performance_daily_lines;
 
@@ -71,6 +111,24 @@ BEGIN
     RETURN;
   END IF;
 
+  IF bulk THEN
+    v_phase := clock_timestamp();
+
+    ALTER TABLE core.fact_app_performance_daily
+      DROP CONSTRAINT IF EXISTS fk_fact_app_performance_daily_1;
+
+    DROP INDEX IF EXISTS core.idx_fact_app_perf_daily_date;
+    DROP INDEX IF EXISTS core.idx_fact_app_perf_daily_app_id;
+    DROP INDEX IF EXISTS core.idx_fact_app_perf_daily_app_date;
+    DROP INDEX IF EXISTS core.idx_fact_app_perf_daily_country_date;
+
+    INSERT INTO raw.fact_load_timing VALUES
+      (v_run, 'core.fact_app_performance_daily', v_mode, 'drop_secondary', v_phase, clock_timestamp());
+    COMMIT;
+  END IF;
+
+  v_phase := clock_timestamp();
+
   -- Make per-batch inserts faster; adjust if memory is tight
   PERFORM set_config('work_mem', '256MB', true);
 
@@ -212,10 +270,76 @@ BEGIN
     v_from := v_to + 1;
   END LOOP;
 
+  INSERT INTO raw.fact_load_timing VALUES
+    (v_run, 'core.fact_app_performance_daily', v_mode, 'load', v_phase, clock_timestamp());
+  COMMIT;
+
+  IF bulk THEN
+    -- One index at a time, each built by parallel workers; adjust to the server
+    v_phase := clock_timestamp();
+    PERFORM set_config('maintenance_work_mem', '2GB', true);
+    PERFORM set_config('max_parallel_maintenance_workers', '4', true);
+
+    CREATE INDEX IF NOT EXISTS idx_fact_app_perf_daily_date
+      ON core.fact_app_performance_daily("date");
+    CREATE INDEX IF NOT EXISTS idx_fact_app_perf_daily_app_id
+      ON core.fact_app_performance_daily(app_id);
+    CREATE INDEX IF NOT EXISTS idx_fact_app_perf_daily_app_date
+      ON core.fact_app_performance_daily(app_id, "date");
+    CREATE INDEX IF NOT EXISTS idx_fact_app_perf_daily_country_date
+      ON core.fact_app_performance_daily(country_android, "date");
 
+    INSERT INTO raw.fact_load_timing VALUES
+      (v_run, 'core.fact_app_performance_daily', v_mode, 'rebuild_indexes', v_phase, clock_timestamp());
+    COMMIT;
+
+    -- NOT VALID skips the scan under the ACCESS EXCLUSIVE lock; VALIDATE scans with a weaker lock
+    v_phase := clock_timestamp();
+    IF to_regclass('core.dim_app_info_hot') IS NOT NULL THEN
+      ALTER TABLE core.fact_app_performance_daily
+        ADD CONSTRAINT fk_fact_app_performance_daily_1 FOREIGN KEY (app_id)
+        REFERENCES core.dim_app_info_hot(app_id) NOT VALID;
+    ELSE
+      ALTER TABLE core.fact_app_performance_daily
+        ADD CONSTRAINT fk_fact_app_performance_daily_1 FOREIGN KEY (app_id)
+        REFERENCES core.dim_app_info(app_id) NOT VALID;
+    END IF;
+    COMMIT;
+
+    ALTER TABLE core.fact_app_performance_daily
+      VALIDATE CONSTRAINT fk_fact_app_performance_daily_1;
+
+    INSERT INTO raw.fact_load_timing VALUES
+      (v_run, 'core.fact_app_performance_daily', v_mode, 'validate_fk', v_phase, clock_timestamp());
+    COMMIT;
+  END IF;
+
+  INSERT INTO raw.fact_load_timing VALUES
+    (v_run, 'core.fact_app_performance_daily', v_mode, 'total', v_run, clock_timestamp());
   COMMIT;
 
-  -- re-enable autovacuum for staging (optional)
-  ALTER TABLE raw.fact_app_performance_daily_lines SET (autovacuum_enabled = true);
+  RAISE NOTICE 'Full refresh (%) finished in %', v_mode, clock_timestamp() - v_run;
+
+  SELECT
+    pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), p.wal_lsn_start)),
+    b.checkpoints_timed - p.checkpoints_timed_start,
+    b.checkpoints_req   - p.checkpoints_req_start
+  INTO v_wal, v_ckpt_t, v_ckpt_r
+  FROM raw.fact_app_performance_daily_load_progress p
+  CROSS JOIN pg_stat_bgwriter b;
+
+  RAISE NOTICE 'WAL generated since prepare: %. Checkpoints timed/requested: % / %', v_wal, v_ckpt_t, v_ckpt_r;
+
+  IF (SELECT relpersistence FROM pg_class WHERE oid = 'raw.fact_app_performance_daily_lines'::regclass) = 'u' THEN
+    -- WAL-free staging: lines are disposable once promoted
+    TRUNCATE TABLE raw.fact_app_performance_daily_lines;
+  ELSE
+    -- re-enable autovacuum for staging (optional)
+    ALTER TABLE raw.fact_app_performance_daily_lines SET (autovacuum_enabled = true);
+  END IF;
 
 END $$;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables core.fact_app_performance_daily
+\ir bump_load_watermark.sql
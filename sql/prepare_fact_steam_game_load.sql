@@ -2,6 +2,8 @@
 \set ON_ERROR_STOP on
 \pset pager off
 
+\ir staging_mode.sql
+
 -- 0) Ensure schemas exist
 CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS steam;
@@ -10,7 +12,7 @@ CREATE SCHEMA IF NOT EXISTS steam;
 TRUNCATE TABLE steam.fact_steam_game_performance_monthly;
 
 DROP TABLE IF EXISTS raw.fact_steam_game_performance_monthly_missing_app;
-CREATE TABLE raw.fact_steam_game_performance_monthly_missing_app (
+CREATE :staging_kind TABLE raw.fact_steam_game_performance_monthly_missing_app (
   line_no           BIGINT,
   app_id            INTEGER,
   month             DATE,
@@ -20,7 +22,7 @@ CREATE TABLE raw.fact_steam_game_performance_monthly_missing_app (
 
 -- 2) Staging table with line numbers (identity)
 DROP TABLE IF EXISTS raw.fact_steam_game_performance_monthly_lines;
-CREATE TABLE raw.fact_steam_game_performance_monthly_lines (
+CREATE :staging_kind TABLE raw.fact_steam_game_performance_monthly_lines (
   line_no BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
   line    TEXT
 );
@@ -28,6 +30,12 @@ CREATE TABLE raw.fact_steam_game_performance_monthly_lines (
 -- (Optional) reduce noise / avoid autovacuum stealing cycles on staging during the big load
 ALTER TABLE raw.fact_steam_game_performance_monthly_lines SET (autovacuum_enabled = false);
 
+-- COPY into staging (WAL-free with wal_free_staging=on). FREEZE needs the table truncated
+-- in the same transaction as the COPY, hence -1 (single transaction) + TRUNCATE:
+--   pv data.ndjson | psql -v ON_ERROR_STOP=1 -1 \
+--     -c "TRUNCATE raw.fact_steam_game_performance_monthly_lines RESTART IDENTITY" \
+--     -c "COPY raw.fact_steam_game_performance_monthly_lines(line) FROM STDIN WITH (FORMAT csv, DELIMITER E'\x1F', QUOTE E'\x02', ESCAPE E'\x03', FREEZE)"
+
 -- 3) Progress table
 DROP TABLE IF EXISTS raw.fact_steam_game_performance_monthly_load_progress;
 CREATE TABLE raw.fact_steam_game_performance_monthly_load_progress (
@@ -35,16 +43,42 @@ CREATE TABLE raw.fact_steam_game_performance_monthly_load_progress (
   updated_at      timestamptz NOT NULL DEFAULT now(),
   total_lines     BIGINT,
   processed_lines BIGINT NOT NULL DEFAULT 0,
-  inserted_rows   BIGINT NOT NULL DEFAULT 0
+  inserted_rows   BIGINT NOT NULL DEFAULT 0,
+  -- WAL / checkpoint baseline taken before the staging COPY (reported when the load finishes)
+  wal_lsn_start           pg_lsn NOT NULL DEFAULT pg_current_wal_lsn(),
+  checkpoints_timed_start BIGINT,
+  checkpoints_req_start   BIGINT
 );
 
-INSERT INTO raw.fact_steam_game_performance_monthly_load_progress(total_lines, processed_lines, inserted_rows)
-VALUES (NULL, 0, 0);
+INSERT INTO raw.fact_steam_game_performance_monthly_load_progress(total_lines, processed_lines, inserted_rows, checkpoints_timed_start, checkpoints_req_start)
+SELECT NULL, 0, 0, checkpoints_timed, checkpoints_req
+FROM pg_stat_bgwriter;
+
+-- 3b) Timing log (kept across loads so bulk vs incremental full refreshes can be compared)
+CREATE TABLE IF NOT EXISTS raw.fact_load_timing (
+  run_started_at timestamptz NOT NULL,
+  table_name     TEXT        NOT NULL,
+  mode           TEXT        NOT NULL,  -- 'incremental' | 'bulk'
+  phase          TEXT        NOT NULL,  -- 'drop_secondary' | 'load' | 'rebuild_indexes' | 'validate_fk' | 'total'
+  started_at     timestamptz NOT NULL,
+  finished_at    timestamptz NOT NULL
+);
 
 -- 4) Stored procedure: loads from staging in batches and updates progress
+--    CALL steam.load_fact_steam_game_performance_monthly_from_staging();              -- incremental
+--    CALL steam.load_fact_steam_game_performance_monthly_from_staging(500000, true);  -- bulk: full reloads only
+--
+--    Bulk mode drops idx_steam_fact_month / idx_steam_fact_app and fk_steam_fact_app, loads,
+--    rebuilds the indexes with parallel maintenance workers, then re-adds the FK as NOT VALID
+--    and runs VALIDATE CONSTRAINT.
+--    If a bulk run fails midway, re-run it in bulk mode: that recreates the indexes and the FK.
 DROP PROCEDURE IF EXISTS steam.load_fact_steam_game_performance_monthly_from_staging(BIGINT);
+DROP PROCEDURE IF EXISTS steam.load_fact_steam_game_performance_monthly_from_staging(BIGINT, BOOLEAN);
 
-CREATE PROCEDURE steam.load_fact_steam_game_performance_monthly_from_staging(batch_lines BIGINT DEFAULT 500000)
+CREATE PROCEDURE steam.load_fact_steam_game_performance_monthly_from_staging(
+  batch_lines BIGINT  DEFAULT 500000,
+  bulk        BOOLEAN DEFAULT false
+)
 LANGUAGE plpgsql
 AS $$
 DECLARE
@@ -52,6 +86,12 @@ DECLARE
   v_from     BIGINT := 1;
   v_to       BIGINT;
   v_ins      BIGINT;
+  v_mode     TEXT := CASE WHEN bulk THEN 'bulk' ELSE 'incremental' END;
+  v_run      timestamptz := clock_timestamp();
+  v_phase    timestamptz;
+  v_wal      TEXT;
+  v_ckpt_t   BIGINT;
+  v_ckpt_r   BIGINT;
 BEGIN
   SELECT max(line_no) INTO v_total FROM raw.fact_steam_game_performance_monthly_lines;
 
@@ -64,6 +104,22 @@ BEGIN
     RETURN;
   END IF;
 
+  IF bulk THEN
+    v_phase := clock_timestamp();
+
+    ALTER TABLE steam.fact_steam_game_performance_monthly
+      DROP CONSTRAINT IF EXISTS fk_steam_fact_app;
+
+    DROP INDEX IF EXISTS steam.idx_steam_fact_month;
+    DROP INDEX IF EXISTS steam.idx_steam_fact_app;
+
+    INSERT INTO raw.fact_load_timing VALUES
+      (v_run, 'steam.fact_steam_game_performance_monthly', v_mode, 'drop_secondary', v_phase, clock_timestamp());
+    COMMIT;
+  END IF;
+
+  v_phase := clock_timestamp();
+
   -- Make per-batch inserts faster; adjust if memory is tight
   PERFORM set_config('work_mem', '256MB', true);
 
@@ -172,10 +228,64 @@ BEGIN
     v_from := v_to + 1;
   END LOOP;
 
+  INSERT INTO raw.fact_load_timing VALUES
+    (v_run, 'steam.fact_steam_game_performance_monthly', v_mode, 'load', v_phase, clock_timestamp());
+  COMMIT;
+
+  IF bulk THEN
+    -- One index at a time, each built by parallel workers; adjust to the server
+    v_phase := clock_timestamp();
+    PERFORM set_config('maintenance_work_mem', '2GB', true);
+    PERFORM set_config('max_parallel_maintenance_workers', '4', true);
+
+    CREATE INDEX IF NOT EXISTS idx_steam_fact_month ON steam.fact_steam_game_performance_monthly(month);
+    CREATE INDEX IF NOT EXISTS idx_steam_fact_app   ON steam.fact_steam_game_performance_monthly(app_id);
 
+    INSERT INTO raw.fact_load_timing VALUES
+      (v_run, 'steam.fact_steam_game_performance_monthly', v_mode, 'rebuild_indexes', v_phase, clock_timestamp());
+    COMMIT;
+
+    -- NOT VALID skips the scan under the ACCESS EXCLUSIVE lock; VALIDATE scans with a weaker lock
+    v_phase := clock_timestamp();
+    ALTER TABLE steam.fact_steam_game_performance_monthly
+      ADD CONSTRAINT fk_steam_fact_app
+      FOREIGN KEY (app_id) REFERENCES steam.dim_steam_game_info(app_id) NOT VALID;
+    COMMIT;
+
+    ALTER TABLE steam.fact_steam_game_performance_monthly
+      VALIDATE CONSTRAINT fk_steam_fact_app;
+
+    INSERT INTO raw.fact_load_timing VALUES
+      (v_run, 'steam.fact_steam_game_performance_monthly', v_mode, 'validate_fk', v_phase, clock_timestamp());
+    COMMIT;
+  END IF;
+
+  INSERT INTO raw.fact_load_timing VALUES
+    (v_run, 'steam.fact_steam_game_performance_monthly', v_mode, 'total', v_run, clock_timestamp());
   COMMIT;
 
-  -- re-enable autovacuum for staging (optional)
-  ALTER TABLE raw.fact_steam_game_performance_monthly_lines SET (autovacuum_enabled = true);
+  RAISE NOTICE 'Full refresh (%) finished in %', v_mode, clock_timestamp() - v_run;
+
+  SELECT
+    pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), p.wal_lsn_start)),
+    b.checkpoints_timed - p.checkpoints_timed_start,
+    b.checkpoints_req   - p.checkpoints_req_start
+  INTO v_wal, v_ckpt_t, v_ckpt_r
+  FROM raw.fact_steam_game_performance_monthly_load_progress p
+  CROSS JOIN pg_stat_bgwriter b;
+
+  RAISE NOTICE 'WAL generated since prepare: %. Checkpoints timed/requested: % / %', v_wal, v_ckpt_t, v_ckpt_r;
+
+  IF (SELECT relpersistence FROM pg_class WHERE oid = 'raw.fact_steam_game_performance_monthly_lines'::regclass) = 'u' THEN
+    -- WAL-free staging: lines are disposable once promoted
+    TRUNCATE TABLE raw.fact_steam_game_performance_monthly_lines;
+  ELSE
+    -- re-enable autovacuum for staging (optional)
+    ALTER TABLE raw.fact_steam_game_performance_monthly_lines SET (autovacuum_enabled = true);
+  END IF;
 
 END $$;
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables steam.fact_steam_game_performance_monthly
+\ir bump_load_watermark.sql
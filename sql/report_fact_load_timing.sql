@@ -0,0 +1,37 @@
+-- report_fact_load_timing.sql
+-- Compare full-refresh timings of the fact loads: bulk vs incremental (see prepare_fact_*_load.sql)
+\set ON_ERROR_STOP on
+\pset pager off
+
+-- Per run, per phase
+SELECT
+  table_name,
+  run_started_at,
+  mode,
+  phase,
+  finished_at - started_at AS elapsed
+FROM raw.fact_load_timing
+ORDER BY table_name, run_started_at, started_at;
+
+-- Latest full refresh per table and mode, side by side
+WITH latest AS (
+  SELECT DISTINCT ON (table_name, mode)
+    table_name, mode, run_started_at
+  FROM raw.fact_load_timing
+  WHERE phase = 'total'
+  ORDER BY table_name, mode, run_started_at DESC
+)
+SELECT
+  t.table_name,
+  max(t.finished_at - t.started_at) FILTER (WHERE t.mode = 'incremental' AND t.phase = 'total')           AS incremental_total,
+  max(t.finished_at - t.started_at) FILTER (WHERE t.mode = 'bulk'        AND t.phase = 'total')           AS bulk_total,
+  max(t.finished_at - t.started_at) FILTER (WHERE t.mode = 'bulk'        AND t.phase = 'load')            AS bulk_load,
+  max(t.finished_at - t.started_at) FILTER (WHERE t.mode = 'bulk'        AND t.phase = 'rebuild_indexes') AS bulk_rebuild_indexes,
+  max(t.finished_at - t.started_at) FILTER (WHERE t.mode = 'bulk'        AND t.phase = 'validate_fk')     AS bulk_validate_fk
+FROM raw.fact_load_timing t
+JOIN latest l
+  ON l.table_name = t.table_name
+ AND l.mode = t.mode
+ AND l.run_started_at = t.run_started_at
+GROUP BY t.table_name
+ORDER BY t.table_name;
@@ -300,8 +300,14 @@ CREATE TABLE IF NOT EXISTS core.fact_app_performance_daily (
 );
 
 -- Helpful indexes
-CREATE INDEX IF NOT EXISTS idx_dim_app_info_unified_app_id
-  ON core.dim_app_info(unified_app_id);
+-- Skipped once split_dim_app_info.sql has turned core.dim_app_info into a view
+DO $$
+BEGIN
+  IF to_regclass('core.dim_app_info_hot') IS NULL THEN
+    CREATE INDEX IF NOT EXISTS idx_dim_app_info_unified_app_id
+      ON core.dim_app_info(unified_app_id);
+  END IF;
+END $$;
 
 CREATE INDEX IF NOT EXISTS idx_fact_app_perf_daily_date
   ON core.fact_app_performance_daily("date");
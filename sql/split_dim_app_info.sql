@@ -0,0 +1,255 @@
+-- split_dim_app_info.sql
+-- Optional schema mode: vertical hot/cold split of core.dim_app_info.
+--
+-- Notes:
+-- 1) core.dim_app_info_hot holds the key + the narrow attributes used by joins and analytics.
+--    core.dim_app_info_detail holds the wide TEXT/JSONB columns, TOAST-compressed with lz4.
+-- 2) core.dim_app_info becomes a view (hot LEFT JOIN detail) with the original column order,
+--    so existing SELECTs keep working. Queries that only touch hot columns (e.g. the fact-load
+--    `JOIN core.dim_app_info a ON a.app_id = g.app_id`) get the detail join removed by the planner.
+-- 3) The loaders detect this mode, TRUNCATE the two base tables instead of the view and insert
+--    set-based into hot + detail (split_dim_app_info_promote.sql). An INSTEAD OF trigger on the
+--    view still accepts ad-hoc INSERTs, row by row; don't route bulk loads through it.
+-- 4) fk_fact_app_performance_daily_1 is re-pointed to core.dim_app_info_hot(app_id).
+-- 5) Safe to run repeatedly; existing rows in core.dim_app_info are migrated on the first run.
+--    Requires PostgreSQL 14+ built with lz4 (the postgres:16 image is).
+--
+\set ON_ERROR_STOP on
+\pset pager off
+
+BEGIN;
+
+CREATE SCHEMA IF NOT EXISTS core;
+
+CREATE TABLE IF NOT EXISTS core.dim_app_info_hot (
+  app_id TEXT NOT NULL,
+  unified_app_id TEXT,
+  os TEXT,
+  name TEXT,
+  humanized_name TEXT,
+  publisher_id TEXT,
+  publisher_name TEXT,
+  cleaned_publisher_name TEXT,
+  canonical_country TEXT,
+  active BOOLEAN,
+  release_date TIMESTAMPTZ,
+  updated_date TIMESTAMPTZ,
+  country_release_date TIMESTAMPTZ,
+  in_app_purchases BOOLEAN,
+  rating DOUBLE PRECISION,
+  price DOUBLE PRECISION,
+  global_rating_count INTEGER,
+  rating_count INTEGER,
+  content_rating TEXT,
+  revenue_multiplier INTEGER,
+  CONSTRAINT pk_dim_app_info_hot PRIMARY KEY (app_id),
+  CONSTRAINT fk_dim_app_info_hot_1 FOREIGN KEY (unified_app_id)
+    REFERENCES core.dim_game_info(unified_app_id)
+);
+
+CREATE TABLE IF NOT EXISTS core.dim_app_info_detail (
+  app_id TEXT NOT NULL,
+  icon_url TEXT,
+  url TEXT,
+  categories JSONB COMPRESSION lz4,
+  valid_countries JSONB COMPRESSION lz4,
+  top_countries JSONB COMPRESSION lz4,
+  app_view_url TEXT,
+  publisher_profile_url TEXT,
+  rating_count_for_current_version INTEGER,
+  rating_for_current_version DOUBLE PRECISION,
+  version TEXT,
+  apple_watch_enabled BOOLEAN,
+  imessage_enabled BOOLEAN,
+  imessage_icon TEXT,
+  humanized_worldwide_last_month_downloads JSONB COMPRESSION lz4,
+  humanized_worldwide_last_month_revenue JSONB COMPRESSION lz4,
+  bundle_id TEXT,
+  support_url TEXT,
+  website_url TEXT,
+  privacy_policy_url TEXT,
+  eula_url TEXT,
+  publisher_email TEXT,
+  publisher_address TEXT COMPRESSION lz4,
+  publisher_country TEXT,
+  feature_graphic TEXT,
+  short_description TEXT COMPRESSION lz4,
+  advisories JSONB COMPRESSION lz4,
+  screenshot_urls JSONB COMPRESSION lz4,
+  tablet_screenshot_urls JSONB COMPRESSION lz4,
+  description TEXT COMPRESSION lz4,
+  subtitle TEXT,
+  promo_text TEXT COMPRESSION lz4,
+  permissions JSONB COMPRESSION lz4,
+  supported_languages JSONB COMPRESSION lz4,
+  CONSTRAINT pk_dim_app_info_detail PRIMARY KEY (app_id),
+  CONSTRAINT fk_dim_app_info_detail_1 FOREIGN KEY (app_id)
+    REFERENCES core.dim_app_info_hot(app_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_dim_app_info_hot_unified_app_id
+  ON core.dim_app_info_hot(unified_app_id);
+
+-- Migrate the monolithic table (first run only) and replace it with the compatibility view.
+-- Same set-based fan-out as the loaders: stage the old rows, then split_dim_app_info_promote.sql.
+SELECT EXISTS (
+  SELECT 1
+  FROM pg_class c
+  JOIN pg_namespace n ON n.oid = c.relnamespace
+  WHERE n.nspname = 'core'
+    AND c.relname = 'dim_app_info'
+    AND c.relkind = 'r'
+) AS dim_app_info_is_table \gset
+
+\if :dim_app_info_is_table
+CREATE TEMP TABLE dim_app_info_split_stage ON COMMIT DROP AS
+SELECT * FROM core.dim_app_info;
+
+\ir split_dim_app_info_promote.sql
+
+ALTER TABLE core.fact_app_performance_daily
+  DROP CONSTRAINT IF EXISTS fk_fact_app_performance_daily_1;
+
+DROP TABLE core.dim_app_info;
+\endif
+
+-- Compatibility view: same name and column order as the original table
+CREATE OR REPLACE VIEW core.dim_app_info AS
+SELECT
+  h.app_id,
+  h.canonical_country,
+  h.name,
+  h.publisher_name,
+  h.publisher_id,
+  h.humanized_name,
+  d.icon_url,
+  h.os,
+  h.active,
+  d.url,
+  d.categories,
+  d.valid_countries,
+  d.top_countries,
+  d.app_view_url,
+  d.publisher_profile_url,
+  h.release_date,
+  h.updated_date,
+  h.in_app_purchases,
+  h.rating,
+  h.price,
+  h.global_rating_count,
+  h.rating_count,
+  d.rating_count_for_current_version,
+  d.rating_for_current_version,
+  d.version,
+  d.apple_watch_enabled,
+  d.imessage_enabled,
+  d.imessage_icon,
+  d.humanized_worldwide_last_month_downloads,
+  d.humanized_worldwide_last_month_revenue,
+  d.bundle_id,
+  d.support_url,
+  d.website_url,
+  d.privacy_policy_url,
+  d.eula_url,
+  d.publisher_email,
+  d.publisher_address,
+  d.publisher_country,
+  d.feature_graphic,
+  d.short_description,
+  d.advisories,
+  h.content_rating,
+  h.unified_app_id,
+  d.screenshot_urls,
+  d.tablet_screenshot_urls,
+  d.description,
+  d.subtitle,
+  d.promo_text,
+  d.permissions,
+  d.supported_languages,
+  h.country_release_date,
+  h.cleaned_publisher_name,
+  h.revenue_multiplier
+FROM core.dim_app_info_hot h
+LEFT JOIN core.dim_app_info_detail d
+  ON d.app_id = h.app_id;
+
+-- Route ad-hoc INSERTs on the view to the hot + detail tables (row by row; loaders bypass this)
+CREATE OR REPLACE FUNCTION core.dim_app_info_split_insert()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO core.dim_app_info_hot (
+    app_id, unified_app_id, os, name, humanized_name,
+    publisher_id, publisher_name, cleaned_publisher_name, canonical_country, active,
+    release_date, updated_date, country_release_date, in_app_purchases,
+    rating, price, global_rating_count, rating_count, content_rating, revenue_multiplier
+  )
+  VALUES (
+    NEW.app_id, NEW.unified_app_id, NEW.os, NEW.name, NEW.humanized_name,
+    NEW.publisher_id, NEW.publisher_name, NEW.cleaned_publisher_name, NEW.canonical_country, NEW.active,
+    NEW.release_date, NEW.updated_date, NEW.country_release_date, NEW.in_app_purchases,
+    NEW.rating, NEW.price, NEW.global_rating_count, NEW.rating_count, NEW.content_rating, NEW.revenue_multiplier
+  );
+
+  INSERT INTO core.dim_app_info_detail (
+    app_id, icon_url, url, categories, valid_countries, top_countries,
+    app_view_url, publisher_profile_url,
+    rating_count_for_current_version, rating_for_current_version, version,
+    apple_watch_enabled, imessage_enabled, imessage_icon,
+    humanized_worldwide_last_month_downloads, humanized_worldwide_last_month_revenue,
+    bundle_id, support_url, website_url, privacy_policy_url, eula_url,
+    publisher_email, publisher_address, publisher_country, feature_graphic,
+    short_description, advisories, screenshot_urls, tablet_screenshot_urls,
+    description, subtitle, promo_text, permissions, supported_languages
+  )
+  VALUES (
+    NEW.app_id, NEW.icon_url, NEW.url, NEW.categories, NEW.valid_countries, NEW.top_countries,
+    NEW.app_view_url, NEW.publisher_profile_url,
+    NEW.rating_count_for_current_version, NEW.rating_for_current_version, NEW.version,
+    NEW.apple_watch_enabled, NEW.imessage_enabled, NEW.imessage_icon,
+    NEW.humanized_worldwide_last_month_downloads, NEW.humanized_worldwide_last_month_revenue,
+    NEW.bundle_id, NEW.support_url, NEW.website_url, NEW.privacy_policy_url, NEW.eula_url,
+    NEW.publisher_email, NEW.publisher_address, NEW.publisher_country, NEW.feature_graphic,
+    NEW.short_description, NEW.advisories, NEW.screenshot_urls, NEW.tablet_screenshot_urls,
+    NEW.description, NEW.subtitle, NEW.promo_text, NEW.permissions, NEW.supported_languages
+  );
+
+  RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_dim_app_info_split_insert ON core.dim_app_info;
+CREATE TRIGGER trg_dim_app_info_split_insert
+  INSTEAD OF INSERT ON core.dim_app_info
+  FOR EACH ROW
+  EXECUTE FUNCTION core.dim_app_info_split_insert();
+
+-- Facts now reference the narrow hot table
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1
+    FROM pg_constraint
+    WHERE conname = 'fk_fact_app_performance_daily_1'
+      AND conrelid = 'core.fact_app_performance_daily'::regclass
+  ) THEN
+    ALTER TABLE core.fact_app_performance_daily
+      ADD CONSTRAINT fk_fact_app_performance_daily_1 FOREIGN KEY (app_id)
+      REFERENCES core.dim_app_info_hot(app_id);
+  END IF;
+END $$;
+
+COMMIT;
+
+ANALYZE core.dim_app_info_hot;
+ANALYZE core.dim_app_info_detail;
+
+-- Quick checks: hot vs detail footprint
+SELECT
+  c.relname,
+  pg_size_pretty(pg_relation_size(c.oid))       AS heap_size,
+  pg_size_pretty(pg_total_relation_size(c.oid)) AS total_size
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'core'
+  AND c.relname IN ('dim_app_info_hot', 'dim_app_info_detail');
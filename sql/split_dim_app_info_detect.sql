@@ -0,0 +1,4 @@
+-- split_dim_app_info_detect.sql  (included via \ir by every loader that writes core.dim_app_info)
+-- Hot/cold split mode (split_dim_app_info.sql): core.dim_app_info is a view over two tables.
+-- Sets :dim_app_info_split for the loader's \if blocks (TRUNCATE targets, ALTERs, staging).
+SELECT to_regclass('core.dim_app_info_hot') IS NOT NULL AS dim_app_info_split \gset
@@ -0,0 +1,42 @@
+-- split_dim_app_info_promote.sql  (included via \ir by the dim_app_info loaders in split mode
+-- and by the first-run migration in split_dim_app_info.sql)
+-- Set-based fan-out of the staged rows into core.dim_app_info_hot + core.dim_app_info_detail.
+-- Must run in the caller's transaction, after it filled pg_temp.dim_app_info_split_stage
+-- (split_dim_app_info_stage.sql creates it ON COMMIT DROP). The INSTEAD OF trigger in
+-- split_dim_app_info.sql keeps its own copy of these column lists.
+
+INSERT INTO core.dim_app_info_hot (
+  app_id, unified_app_id, os, name, humanized_name,
+  publisher_id, publisher_name, cleaned_publisher_name, canonical_country, active,
+  release_date, updated_date, country_release_date, in_app_purchases,
+  rating, price, global_rating_count, rating_count, content_rating, revenue_multiplier
+)
+SELECT
+  app_id, unified_app_id, os, name, humanized_name,
+  publisher_id, publisher_name, cleaned_publisher_name, canonical_country, active,
+  release_date, updated_date, country_release_date, in_app_purchases,
+  rating, price, global_rating_count, rating_count, content_rating, revenue_multiplier
+FROM pg_temp.dim_app_info_split_stage;
+
+INSERT INTO core.dim_app_info_detail (
+  app_id, icon_url, url, categories, valid_countries, top_countries,
+  app_view_url, publisher_profile_url,
+  rating_count_for_current_version, rating_for_current_version, version,
+  apple_watch_enabled, imessage_enabled, imessage_icon,
+  humanized_worldwide_last_month_downloads, humanized_worldwide_last_month_revenue,
+  bundle_id, support_url, website_url, privacy_policy_url, eula_url,
+  publisher_email, publisher_address, publisher_country, feature_graphic,
+  short_description, advisories, screenshot_urls, tablet_screenshot_urls,
+  description, subtitle, promo_text, permissions, supported_languages
+)
+SELECT
+  app_id, icon_url, url, categories, valid_countries, top_countries,
+  app_view_url, publisher_profile_url,
+  rating_count_for_current_version, rating_for_current_version, version,
+  apple_watch_enabled, imessage_enabled, imessage_icon,
+  humanized_worldwide_last_month_downloads, humanized_worldwide_last_month_revenue,
+  bundle_id, support_url, website_url, privacy_policy_url, eula_url,
+  publisher_email, publisher_address, publisher_country, feature_graphic,
+  short_description, advisories, screenshot_urls, tablet_screenshot_urls,
+  description, subtitle, promo_text, permissions, supported_languages
+FROM pg_temp.dim_app_info_split_stage;
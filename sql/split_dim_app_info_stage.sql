@@ -0,0 +1,13 @@
+-- split_dim_app_info_stage.sql  (included via \ir by the dim_app_info loaders, inside their insert transaction)
+-- Sets :dim_app_info_target for the loader's INSERT:
+--   split mode  -> a temp stage, fanned out set-based afterwards by split_dim_app_info_promote.sql
+--                  (the view's per-row trigger is for ad-hoc use only)
+--   plain mode  -> core.dim_app_info itself
+-- Requires :dim_app_info_split (split_dim_app_info_detect.sql).
+
+\if :dim_app_info_split
+CREATE TEMP TABLE dim_app_info_split_stage (LIKE core.dim_app_info) ON COMMIT DROP;
+\set dim_app_info_target pg_temp.dim_app_info_split_stage
+\else
+\set dim_app_info_target core.dim_app_info
+\endif
@@ -0,0 +1,31 @@
+-- staging_mode.sql  (included by the load scripts via \ir)
+-- WAL-free staging mode, off by default:
+--   psql -v wal_free_staging=on -v app_ndjson=... -f load_dim_app_info_ndjson.sql
+--
+-- Notes:
+-- 1) On: raw.*_lines (NDJSON) / raw.*_raw (CSV) / *_rejects / *_missing_* are created UNLOGGED
+--    (no WAL; emptied after a crash, which is fine for throwaway staging) and the *_lines / *_raw
+--    tables are truncated after promotion.
+-- 2) Either way the *_lines / *_raw tables are created in the same transaction as their COPY, so
+--    COPY ... WITH (FREEZE) writes pre-frozen rows and later hint-bit / vacuum passes skip them.
+-- 3) Also snapshots the WAL position + checkpoint counters; wal_report.sql prints the delta.
+--    pv-driven loads (prepare_fact_*.sql, load_fact_steam_game_performance_monthly_ndjson.sql) end in
+--    another session, so they keep their baseline in the progress table and report it from there.
+
+\if :{?wal_free_staging}
+\else
+\set wal_free_staging off
+\endif
+
+\if :wal_free_staging
+\set staging_kind UNLOGGED
+\else
+\set staging_kind ''
+\endif
+
+-- pg_stat_bgwriter has the checkpoint counters up to PG16 (PG17: pg_stat_checkpointer)
+SELECT
+  pg_current_wal_lsn() AS wal_lsn_start,
+  checkpoints_timed    AS checkpoints_timed_start,
+  checkpoints_req      AS checkpoints_req_start
+FROM pg_stat_bgwriter \gset
@@ -9,6 +9,9 @@ DECLARE
   v_to      BIGINT;
   v_batch   BIGINT := 200000; -- adjust
   v_ins     BIGINT;
+  v_wal     TEXT;
+  v_ckpt_t  BIGINT;
+  v_ckpt_r  BIGINT;
 BEGIN
   SELECT max(line_no) INTO v_total FROM raw.fact_steam_game_perf_monthly_lines;
 
@@ -67,7 +70,30 @@ BEGIN
 
     v_from := v_to + 1;
   END LOOP;
+
+  SELECT
+    pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), p.wal_lsn_start)),
+    b.checkpoints_timed - p.checkpoints_timed_start,
+    b.checkpoints_req   - p.checkpoints_req_start
+  INTO v_wal, v_ckpt_t, v_ckpt_r
+  FROM raw.fact_steam_game_perf_monthly_progress p
+  CROSS JOIN pg_stat_bgwriter b;
+
+  RAISE NOTICE 'WAL generated since prepare: %. Checkpoints timed/requested: % / %', v_wal, v_ckpt_t, v_ckpt_r;
 END $$;
 
 SELECT COUNT(*) AS fact_steam_rows FROM steam.fact_steam_game_performance_monthly;
 SELECT * FROM steam.fact_steam_game_performance_monthly ORDER BY month, app_id LIMIT 10;
+
+-- WAL-free staging (UNLOGGED lines table): disposable once promoted
+SELECT relpersistence = 'u' AS staging_unlogged
+FROM pg_class
+WHERE oid = 'raw.fact_steam_game_perf_monthly_lines'::regclass \gset
+
+\if :staging_unlogged
+TRUNCATE TABLE raw.fact_steam_game_perf_monthly_lines;
+\endif
+
+-- Let readers know these tables changed (invalidates dashboard caches)
+\set watermark_tables steam.fact_steam_game_performance_monthly
+\ir bump_load_watermark.sql
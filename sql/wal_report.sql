@@ -0,0 +1,9 @@
+-- wal_report.sql  (included by the load scripts via \ir, after staging_mode.sql)
+-- WAL volume + checkpoints since staging_mode.sql ran; compare runs with wal_free_staging on/off.
+
+SELECT
+  :'wal_free_staging'                                                       AS wal_free_staging,
+  pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), :'wal_lsn_start')) AS wal_generated,
+  checkpoints_timed - :checkpoints_timed_start                              AS checkpoints_timed,
+  checkpoints_req   - :checkpoints_req_start                                AS checkpoints_requested
+FROM pg_stat_bgwriter;
@@ -0,0 +1,277 @@
+import argparse
+import heapq
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def render_bar(done: int, total: int, width: int = 30) -> str:
+    if total <= 0:
+        return "[" + "?" * width + "]"
+    ratio = max(0.0, min(1.0, done / total))
+    filled = int(ratio * width)
+    return "[" + "#" * filled + "-" * (width - filled) + "]"
+
+
+def fmt_bytes(n: float) -> str:
+    units = ["B", "KB", "MB", "GB", "TB"]
+    f = float(n)
+    for u in units:
+        if f < 1024.0:
+            return f"{f:.1f}{u}"
+        f /= 1024.0
+    return f"{f:.1f}PB"
+
+
+def default_out_path(inp: str) -> str:
+    base, ext = os.path.splitext(inp)
+    if ext.lower() != ".ndjson":
+        return inp + ".DEDUP.ndjson"
+    return base + ".DEDUP.ndjson"
+
+
+def reject_constant(name: str) -> Any:
+    # NaN / Infinity / -Infinity: Python's json accepts them, Postgres jsonb does not
+    raise ValueError(f"invalid JSON token {name}")
+
+
+def pg_jsonb_ok(obj: Any) -> bool:
+    """
+    False if Postgres would refuse the parsed document as jsonb:
+    a \\u0000 or a lone surrogate in any string, object keys included.
+    """
+    stack = [obj]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, dict):
+            stack.extend(v.keys())
+            stack.extend(v.values())
+        elif isinstance(v, list):
+            stack.extend(v)
+        elif isinstance(v, str):
+            if "\x00" in v or any("\ud800" <= ch <= "\udfff" for ch in v):
+                return False
+    return True
+
+
+def extract_key(raw: bytes, key_field: str, strip_key: bool = False) -> Optional[str]:
+    """
+    Return the dedup key of one NDJSON line, or None if the whole line is not
+    valid jsonb for Postgres, or has an empty key. Those lines are passed
+    through untouched and never compete for a key, so the SQL loaders still
+    record them as rejects and a bad line can't shadow a good one.
+
+    The key is the text Postgres `j->>'<key_field>'` would return, untrimmed,
+    so "123" and "123 " stay distinct exactly like in the loaders.
+    Use strip_key only for loaders that btrim() the key (the steam loader does).
+    """
+    try:
+        # keep numbers as their JSON text, like ->> does
+        obj = json.loads(raw, parse_int=str, parse_float=str, parse_constant=reject_constant)
+    except Exception:
+        return None
+    if not isinstance(obj, dict) or not pg_jsonb_ok(obj):
+        return None
+    val = obj.get(key_field)
+    if val is None:
+        return None
+    if isinstance(val, bool):
+        key = "true" if val else "false"
+    elif isinstance(val, str):
+        key = val
+    else:
+        # objects / arrays are never valid keys; let the loader reject them
+        return None
+    if strip_key:
+        key = key.strip()
+    if key.strip() == "":
+        return None
+    return key
+
+
+def spill_run(entries: Dict[str, Tuple[int, int]], tmp_dir: str) -> str:
+    """
+    Write the in-memory key -> (source order, offset) map to a key-sorted run file.
+    Only keys and positions are written, never the record itself.
+    """
+    fd, path = tempfile.mkstemp(prefix="dedup_run_", suffix=".ndjson", dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="ascii", newline="") as f_run:
+            for key in sorted(entries):
+                order, offset = entries[key]
+                # ensure_ascii: \\u escapes round-trip any key, whatever it contains
+                f_run.write(json.dumps([key, order, offset], ensure_ascii=True) + "\n")
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def read_run(path: str) -> Iterator[Tuple[str, int, int]]:
+    with open(path, "r", encoding="ascii") as f_run:
+        for line in f_run:
+            key, order, offset = json.loads(line)
+            yield key, order, offset
+
+
+def merge_winners(
+    runs: List[Iterator[Tuple[str, int, int]]],
+    keep: str,
+) -> Iterator[Tuple[str, int, int]]:
+    """
+    K-way merge of key-sorted runs; yields exactly one (key, order, offset) per key.
+    Ties across runs are resolved by source order: the highest order wins for
+    keep="last", the lowest for keep="first".
+    """
+    winner: Optional[Tuple[str, int, int]] = None
+    for entry in heapq.merge(*runs, key=lambda e: (e[0], e[1])):
+        if winner is not None and entry[0] == winner[0]:
+            if keep == "last":
+                winner = entry  # merge yields same-key entries in ascending order
+            continue
+        if winner is not None:
+            yield winner
+        winner = entry
+    if winner is not None:
+        yield winner
+
+
+def main(
+    inp: str,
+    outp: str,
+    key_field: str = "app_id",
+    keep: str = "last",
+    strip_key: bool = False,
+    max_keys: int = 2_000_000,
+    tmp_dir: Optional[str] = None,
+) -> None:
+    total_size = os.path.getsize(inp)
+    start = time.time()
+    last_print = 0.0
+
+    entries: Dict[str, Tuple[int, int]] = {}
+    run_paths: List[str] = []
+
+    lines_in = 0
+    passthrough = 0
+    blank = 0
+    offset = 0
+
+    written = 0
+    finished = False
+    try:
+        with open(inp, "rb") as f_in, open(outp, "wb") as f_out:
+            # Pass 1: build key -> (source order, byte offset); spill sorted runs past max_keys
+            for raw in f_in:
+                line_offset = offset
+                offset += len(raw)
+                lines_in += 1
+
+                if not raw.strip():
+                    blank += 1
+                    continue
+
+                key = extract_key(raw, key_field, strip_key)
+                if key is None:
+                    # Invalid / keyless lines go straight through for the rejects tables
+                    f_out.write(raw if raw.endswith(b"\n") else raw + b"\n")
+                    passthrough += 1
+                    continue
+
+                if keep == "last" or key not in entries:
+                    entries[key] = (lines_in, line_offset)
+
+                if len(entries) >= max_keys:
+                    run_paths.append(spill_run(entries, tmp_dir or os.path.dirname(os.path.abspath(outp))))
+                    entries = {}
+
+                now = time.time()
+                if now - last_print >= 0.2:
+                    bar = render_bar(offset, total_size)
+                    elapsed = now - start
+                    speed = offset / elapsed if elapsed > 0 else 0.0
+                    pct = (offset / total_size * 100.0) if total_size > 0 else 0.0
+                    sys.stdout.write(
+                        f"\r{bar} {pct:6.2f}% {fmt_bytes(offset)}/{fmt_bytes(total_size)} "
+                        f"{fmt_bytes(speed)}/s lines:{lines_in:,} runs:{len(run_paths):,}"
+                    )
+                    sys.stdout.flush()
+                    last_print = now
+
+            sys.stdout.write("\n")
+
+            # Pass 2: merge runs (keys only) and copy each winning record from its offset
+            in_memory = sorted((k, o, off) for k, (o, off) in entries.items())
+            entries = {}
+            runs = [read_run(p) for p in run_paths] + [iter(in_memory)]
+
+            for _, _, rec_offset in merge_winners(runs, keep):
+                f_in.seek(rec_offset)
+                raw = f_in.readline()
+                f_out.write(raw if raw.endswith(b"\n") else raw + b"\n")
+                written += 1
+        finished = True
+    finally:
+        # Spill runs never outlive the call; a failed run leaves no partial output either
+        for p in run_paths:
+            if os.path.exists(p):
+                os.remove(p)
+        if not finished and os.path.exists(outp):
+            os.remove(outp)
+
+    elapsed = time.time() - start
+    print(f"Done. Wrote: {outp}")
+    print(
+        f"Lines: {lines_in:,} | unique {key_field}: {written:,} | "
+        f"duplicates dropped: {lines_in - written - passthrough - blank:,} | "
+        f"passed through: {passthrough:,} | blank skipped: {blank:,}"
+    )
+    print(f"Policy: {keep}-wins | spilled runs: {len(run_paths):,} | elapsed: {elapsed:.1f}s")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Deduplicate NDJSON by key before COPY (external-memory, keeps one record per key)."
+    )
+    ap.add_argument("input", help="Input NDJSON path")
+    ap.add_argument("-o", "--output", default=None, help="Output NDJSON path (default: <input>.DEDUP.ndjson)")
+    ap.add_argument("-k", "--key", default="app_id", help="JSON field to dedup on. Default: app_id")
+    ap.add_argument(
+        "--keep",
+        choices=["last", "first"],
+        default="last",
+        help="Which duplicate wins, by position in the input file. Default: last",
+    )
+    ap.add_argument(
+        "--max-keys",
+        type=int,
+        default=2_000_000,
+        help="Keys held in memory before spilling a sorted run to disk. Default: 2000000",
+    )
+    ap.add_argument(
+        "--strip-key",
+        action="store_true",
+        help="Trim whitespace around the key (only for loaders that btrim it, e.g. the steam loader)",
+    )
+    ap.add_argument("--tmp-dir", default=None, help="Directory for spill files (default: next to output)")
+    return ap.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.max_keys <= 0:
+        raise SystemExit("--max-keys must be positive")
+
+    outp = args.output or default_out_path(args.input)
+    main(
+        args.input,
+        outp,
+        key_field=args.key,
+        keep=args.keep,
+        strip_key=args.strip_key,
+        max_keys=args.max_keys,
+        tmp_dir=args.tmp_dir,
+    )